@@ -1,9 +1,17 @@
+import os
+import sys
 import time
+import queue
+import threading
 import subprocess
 import ctypes
-from dataclasses import dataclass
 from typing import Dict, Set
 
+if os.name == "nt":
+    import msvcrt
+else:
+    import select
+
 import pygame
 
 # -------------------------
@@ -29,74 +37,245 @@ MOUSE_OFFSCREEN_X = -10000
 MOUSE_OFFSCREEN_Y = -10000
 
 
+# -------------------------
+# LOGGING
+# -------------------------
+# Console writes on Windows can stall for milliseconds; keep them off the
+# polling threads by handing lines to a daemon writer via a queue. A None
+# sentinel tells the writer to flush and stop at shutdown.
+_log_queue: "queue.SimpleQueue[str | None]" = queue.SimpleQueue()
+
+
+def _log_writer() -> None:
+    while True:
+        line = _log_queue.get()
+        if line is None:
+            break
+        sys.stdout.write(line + "\n")
+        if _log_queue.empty():
+            sys.stdout.flush()
+
+
+def log(line: str) -> None:
+    _log_queue.put(line)
+
+
+def shutdown_logging() -> None:
+    """Drain any queued lines before the process exits."""
+    _log_queue.put(None)
+    _log_thread.join(timeout=2.0)
+    sys.stdout.flush()
+
+
+_log_thread = threading.Thread(target=_log_writer, daemon=True, name="log-writer")
+_log_thread.start()
+
+
 # -------------------------
 # DATA TYPES
 # -------------------------
-@dataclass(frozen=True)
-class ButtonInput:
-    joystick_id: int
-    button_index: int
+# A button is identified by a packed int key: (joystick_id << 16) | button_index.
+# Plain ints hash/compare natively, so the pressed/trigger sets avoid the
+# per-instance allocation and interpreted __eq__/__hash__ of a dataclass.
+def bkey(joystick_id: int, button_index: int) -> int:
+    return (joystick_id << 16) | button_index
+
 
-    def __str__(self) -> str:
-        return f"Joy{self.joystick_id}:Btn{self.button_index}"
+def fmt_bkey(key: int) -> str:
+    return f"Joy{key >> 16}:Btn{key & 0xFFFF}"
+
+
+# Display names for every known key, filled in at init. The key space is tiny
+# (controllers x buttons), so precomputing beats re-formatting on every log line.
+_BUTTON_NAMES: Dict[int, str] = {}
+
+
+def button_name(key: int) -> str:
+    return _BUTTON_NAMES.get(key) or fmt_bkey(key)
+
+
+def drop_joystick_keys(pressed: Set[int], joystick_id: int) -> None:
+    """Discard every pressed key belonging to a disconnected joystick.
+
+    SDL does not synthesize JOYBUTTONUP on disconnect, so without this a pad
+    that drops while a button is down would look held forever.
+    """
+    for key in [k for k in pressed if k >> 16 == joystick_id]:
+        pressed.discard(key)
 
 
 # -------------------------
 # PROCESS CONTROL
 # -------------------------
-def _run_tasklist_csv() -> str:
-    cp = subprocess.run(
-        ["tasklist", "/FO", "CSV", "/NH"],
+# Toolhelp32 snapshot via ctypes: enumerating processes natively takes a few
+# ms, while spawning tasklist.exe (WMI-backed) takes hundreds of ms per call.
+_TH32CS_SNAPPROCESS = 0x00000002
+_INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True) if os.name == "nt" else None
+
+# Keep taskkill/tasklist from flashing a console window on each launch:
+# CREATE_NO_WINDOW skips console allocation and STARTF_USESHOWWINDOW/SW_HIDE
+# covers anything that still tries to show one.
+if os.name == "nt":
+    _SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW
+    _SUBPROCESS_STARTUPINFO = subprocess.STARTUPINFO()
+    _SUBPROCESS_STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _SUBPROCESS_STARTUPINFO.wShowWindow = 0  # SW_HIDE
+else:
+    _SUBPROCESS_FLAGS = 0
+    _SUBPROCESS_STARTUPINFO = None
+
+
+def _run_hidden(args) -> "subprocess.CompletedProcess[bytes]":
+    """Run a console tool with no visible window and raw (binary) pipes."""
+    return subprocess.run(
+        args,
         capture_output=True,
-        text=True,
         check=False,
-        encoding="utf-8",
-        errors="replace",
+        creationflags=_SUBPROCESS_FLAGS,
+        startupinfo=_SUBPROCESS_STARTUPINFO,
     )
-    return cp.stdout
 
 
-def is_process_running(process_name: str) -> bool:
-    output = _run_tasklist_csv()
-    needle = f"\"{process_name}\""
-    return needle.lower() in output.lower()
+class _PROCESSENTRY32W(ctypes.Structure):
+    _fields_ = [
+        ("dwSize", ctypes.c_ulong),
+        ("cntUsage", ctypes.c_ulong),
+        ("th32ProcessID", ctypes.c_ulong),
+        ("th32DefaultHeapID", ctypes.c_void_p),
+        ("th32ModuleID", ctypes.c_ulong),
+        ("cntThreads", ctypes.c_ulong),
+        ("th32ParentProcessID", ctypes.c_ulong),
+        ("pcPriClassBase", ctypes.c_long),
+        ("dwFlags", ctypes.c_ulong),
+        ("szExeFile", ctypes.c_wchar * 260),
+    ]
+
+
+if _kernel32 is not None:
+    # Explicit prototypes: without them ctypes assumes a C int return, which
+    # truncates the 64-bit HANDLE — a failed snapshot (-1) would then never
+    # compare equal to INVALID_HANDLE_VALUE and the error branch is dead.
+    _kernel32.CreateToolhelp32Snapshot.restype = ctypes.c_void_p
+    _kernel32.CreateToolhelp32Snapshot.argtypes = (ctypes.c_ulong, ctypes.c_ulong)
+    _kernel32.Process32FirstW.argtypes = (ctypes.c_void_p, ctypes.POINTER(_PROCESSENTRY32W))
+    _kernel32.Process32NextW.argtypes = (ctypes.c_void_p, ctypes.POINTER(_PROCESSENTRY32W))
+    _kernel32.CloseHandle.argtypes = (ctypes.c_void_p,)
+
+
+def _list_process_names_win() -> Set[str]:
+    running: Set[str] = set()
+    snapshot = _kernel32.CreateToolhelp32Snapshot(_TH32CS_SNAPPROCESS, 0)
+    if snapshot == _INVALID_HANDLE_VALUE:
+        raise OSError(f"CreateToolhelp32Snapshot failed (error {ctypes.get_last_error()})")
+    try:
+        entry = _PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(_PROCESSENTRY32W)
+        ok = _kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while ok:
+            running.add(entry.szExeFile.lower())
+            ok = _kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        _kernel32.CloseHandle(snapshot)
+    return running
 
 
-def kill_process_by_name(process_name: str) -> bool:
-    if not is_process_running(process_name):
-        print(f"[kill] Not running: {process_name}")
-        return False
+def _run_tasklist_csv() -> str:
+    cp = _run_hidden(["tasklist", "/FO", "CSV", "/NH"])
+    # Binary pipes + one decode: skips the incremental codec machinery that
+    # text=True wraps around every read.
+    return cp.stdout.decode("utf-8", "replace")
 
-    print(f"[kill] Attempting to kill: {process_name}")
-    cp = subprocess.run(
-        ["taskkill", "/IM", process_name, "/F"],
-        capture_output=True,
-        text=True,
-        check=False,
-        encoding="utf-8",
-        errors="replace",
-    )
 
-    if cp.returncode == 0:
-        print(f"[kill] Killed: {process_name}")
-    else:
-        print(f"[kill] taskkill failed for {process_name} (code {cp.returncode})")
-        if cp.stdout.strip():
-            print(f"[kill] stdout: {cp.stdout.strip()}")
-        if cp.stderr.strip():
-            print(f"[kill] stderr: {cp.stderr.strip()}")
+# (timestamp, names) of the last snapshot; reused while younger than the TTL
+# so rapid re-triggers don't re-enumerate the process table each time.
+_SNAPSHOT_TTL_SECONDS = 2.0
+_snapshot_cache: "tuple[float, Set[str]] | None" = None
 
-    return True
 
+def invalidate_process_snapshot() -> None:
+    global _snapshot_cache
+    _snapshot_cache = None
 
-def on_hold_action(trigger_btn: ButtonInput) -> None:
-    print(f"[action] Triggered by holding {trigger_btn} for {HOLD_SECONDS:.2f}s. Killing configured processes if found...")
-    for name in PROCESS_NAMES_TO_KILL:
-        try:
-            kill_process_by_name(name)
-        except Exception as e:
-            print(f"[action] ERROR killing {name}: {e}")
-    print("[action] Done.\n")
+
+def snapshot_running_processes() -> Set[str]:
+    """Return the lowercased image names of all running processes (TTL-cached)."""
+    global _snapshot_cache
+    if _snapshot_cache is not None and time.monotonic() - _snapshot_cache[0] < _SNAPSHOT_TTL_SECONDS:
+        return _snapshot_cache[1]
+    running = _snapshot_running_processes_uncached()
+    _snapshot_cache = (time.monotonic(), running)
+    return running
+
+
+def _snapshot_running_processes_uncached() -> Set[str]:
+    if _kernel32 is not None:
+        return _list_process_names_win()
+
+    # Non-Windows fallback: parse the quoted image-name column of tasklist CSV.
+    running: Set[str] = set()
+    for line in _run_tasklist_csv().splitlines():
+        if line.startswith("\""):
+            end = line.find("\"", 1)
+            if end > 1:
+                running.add(line[1:end].lower())
+    return running
+
+
+def is_process_running(process_name: str) -> bool:
+    return process_name.lower() in snapshot_running_processes()
+
+
+def kill_processes_by_names(process_names) -> None:
+    # taskkill accepts multiple /IM filters, so all targets cost a single
+    # CreateProcess/wait cycle. No tasklist precheck: taskkill itself reports
+    # "not found" per image, so the not-running case is free.
+    args = ["taskkill", "/F"]
+    for name in process_names:
+        args += ["/IM", name]
+
+    log(f"[kill] Attempting to kill: {', '.join(process_names)}")
+    cp = _run_hidden(args)
+    output = cp.stdout.decode("utf-8", "replace") + "\n" + cp.stderr.decode("utf-8", "replace")
+
+    lines = [ln.strip() for ln in output.splitlines() if ln.strip()]
+
+    # taskkill's exit code is locale-independent (0 = killed, 128 = not
+    # found), but with multiple /IM filters and mixed results it commonly
+    # propagates the *last* error — so also accept any English SUCCESS line
+    # as evidence that something was terminated. The mixed case (one emulator
+    # running out of three configured) is this tool's normal case.
+    killed_any = cp.returncode == 0 or any(ln.lower().startswith("success") for ln in lines)
+    for name in process_names:
+        needle = f"\"{name}\"".lower()
+        matched = [ln for ln in lines if needle in ln.lower()]
+        if any(ln.lower().startswith("success") for ln in matched):
+            log(f"[kill] Killed: {name}")
+        elif any("not found" in ln.lower() for ln in matched):
+            log(f"[kill] Not running: {name}")
+        elif matched:
+            log(f"[kill] taskkill failed for {name}: {matched[0]}")
+        elif cp.returncode == 128:
+            # Localized taskkill output we can't parse; trust the exit code.
+            log(f"[kill] Not running: {name}")
+        elif cp.returncode == 0:
+            log(f"[kill] taskkill succeeded (per-name result unavailable for {name})")
+        else:
+            log(f"[kill] taskkill returned code {cp.returncode} for {name}")
+
+    if killed_any:
+        # The cached snapshot no longer reflects reality.
+        invalidate_process_snapshot()
+
+
+def on_hold_action(trigger_btn: int) -> None:
+    log(f"[action] Triggered by holding {button_name(trigger_btn)} for {HOLD_SECONDS:.2f}s. Killing configured processes if found...")
+    try:
+        kill_processes_by_names(PROCESS_NAMES_TO_KILL)
+    except Exception as e:
+        log(f"[action] ERROR killing processes: {e}")
+    log("[action] Done.\n")
 
 
 # -------------------------
@@ -107,16 +286,16 @@ def move_mouse_offscreen(x: int, y: int) -> None:
     # Using ctypes avoids extra dependencies.
     try:
         ctypes.windll.user32.SetCursorPos(int(x), int(y))
-        print(f"[mouse] Moved cursor to off-screen position ({x}, {y})")
+        log(f"[mouse] Moved cursor to off-screen position ({x}, {y})")
     except Exception as e:
-        print(f"[mouse] ERROR moving cursor: {e}")
+        log(f"[mouse] ERROR moving cursor: {e}")
 
 
 def maybe_move_mouse_offscreen_if_both_running() -> None:
     a = is_process_running(MOUSE_OFFSCREEN_PROCESS_A)
     b = is_process_running(MOUSE_OFFSCREEN_PROCESS_B)
 
-    print(f"[mouse] Check: {MOUSE_OFFSCREEN_PROCESS_A}={'RUNNING' if a else 'not running'}, "
+    log(f"[mouse] Check: {MOUSE_OFFSCREEN_PROCESS_A}={'RUNNING' if a else 'not running'}, "
           f"{MOUSE_OFFSCREEN_PROCESS_B}={'RUNNING' if b else 'not running'}")
 
     if a and b:
@@ -127,9 +306,32 @@ def maybe_move_mouse_offscreen_if_both_running() -> None:
 # CONTROLLER INPUT
 # -------------------------
 def init_pygame_and_joysticks() -> Dict[int, pygame.joystick.Joystick]:
+    # SDL drops joystick events when the app has no focused window, and this
+    # console app never creates one — without this hint the event-driven
+    # loops would go deaf after the initial hardware seed.
+    os.environ.setdefault("SDL_JOYSTICK_ALLOW_BACKGROUND_EVENTS", "1")
+
     pygame.init()
     pygame.joystick.init()
 
+    # We only ever consume button events; filter the rest out at the SDL
+    # level so analog sticks/hats can't flood the queue between drains.
+    # JOYAXISMOTION alone can arrive at hundreds of events per second.
+    pygame.event.set_blocked((
+        pygame.JOYAXISMOTION,
+        pygame.JOYBALLMOTION,
+        pygame.JOYHATMOTION,
+        pygame.MOUSEMOTION,
+        pygame.WINDOWEVENT,
+    ))
+    pygame.event.set_allowed((
+        pygame.JOYBUTTONDOWN,
+        pygame.JOYBUTTONUP,
+        pygame.JOYDEVICEADDED,
+        pygame.JOYDEVICEREMOVED,
+        pygame.QUIT,
+    ))
+
     joysticks: Dict[int, pygame.joystick.Joystick] = {}
     count = pygame.joystick.get_count()
     print(f"[init] Detected {count} controller(s).")
@@ -139,6 +341,8 @@ def init_pygame_and_joysticks() -> Dict[int, pygame.joystick.Joystick]:
         js.init()
         joysticks[i] = js
         print(f"[init] Joy{i}: name='{js.get_name()}', buttons={js.get_numbuttons()}")
+        for b in range(js.get_numbuttons()):
+            _BUTTON_NAMES[bkey(i, b)] = fmt_bkey(bkey(i, b))
 
     if count == 0:
         print("[init] No controllers detected. You can plug one in and restart.")
@@ -146,104 +350,151 @@ def init_pygame_and_joysticks() -> Dict[int, pygame.joystick.Joystick]:
     return joysticks
 
 
-def pump_events_nonblocking() -> None:
-    pygame.event.pump()
-
-
-def read_current_pressed_buttons(joysticks: Dict[int, pygame.joystick.Joystick]) -> Set[ButtonInput]:
-    pressed: Set[ButtonInput] = set()
+def read_current_pressed_buttons(joysticks: Dict[int, pygame.joystick.Joystick]) -> Set[int]:
+    pygame.event.pump()  # refresh SDL joystick state before sampling
+    pressed: Set[int] = set()
     for jid, js in joysticks.items():
         btn_count = js.get_numbuttons()
         for b in range(btn_count):
             if js.get_button(b):
-                pressed.add(ButtonInput(jid, b))
+                pressed.add(bkey(jid, b))
     return pressed
 
 
-def collect_buttons_to_trigger(joysticks: Dict[int, pygame.joystick.Joystick]) -> Set[ButtonInput]:
-    import threading
+def _enter_pressed() -> bool:
+    """Non-blocking check for ENTER on stdin (no reader thread needed)."""
+    if os.name == "nt":
+        while msvcrt.kbhit():
+            if msvcrt.getwch() in ("\r", "\n"):
+                return True
+        return False
+    if select.select([sys.stdin], [], [], 0)[0]:
+        sys.stdin.readline()
+        return True
+    return False
 
-    print("\n[setup] Press any buttons on any controller to add them as individual triggers.")
-    print("[setup] OR logic: holding ANY chosen button for the hold duration will trigger the action.")
-    print("[setup] Press ENTER in this console when you're done selecting.\n")
 
-    chosen: Set[ButtonInput] = set()
-    last_printed: Set[ButtonInput] = set()
+def collect_buttons_to_trigger(joysticks: Dict[int, pygame.joystick.Joystick]) -> Set[int]:
+    log("\n[setup] Press any buttons on any controller to add them as individual triggers.")
+    log("[setup] OR logic: holding ANY chosen button for the hold duration will trigger the action.")
+    log("[setup] Press ENTER in this console when you're done selecting.\n")
 
-    done_event = threading.Event()
+    chosen: Set[int] = set()
+    last_printed: Set[int] = set()
 
-    def wait_for_enter():
-        try:
-            input()
-            done_event.set()
-        except Exception:
-            pass
+    log("[setup] Waiting for button presses... (Press ENTER to finish)")
 
-    threading.Thread(target=wait_for_enter, daemon=True).start()
+    # Seed from the current hardware state, then keep it updated from events.
+    pressed_now = read_current_pressed_buttons(joysticks)
 
-    print("[setup] Waiting for button presses... (Press ENTER to finish)")
+    # Block in pygame.event.wait instead of sleep-and-poll ticking: the OS
+    # wakes us the moment a button event arrives, and the timeout only paces
+    # how often we re-check stdin for ENTER. The timeout backs off 1.5x per
+    # idle wakeup (capped below) so an untouched setup screen barely wakes.
+    base_period = 1.0 / POLL_HZ
+    max_idle_period = 0.25
+    period = base_period
 
     try:
-        while not done_event.is_set():
-            pump_events_nonblocking()
+        while not _enter_pressed():
+            ev = pygame.event.wait(timeout=int(period * 1000))
+            got_event = ev.type != pygame.NOEVENT
+            if ev.type == pygame.JOYBUTTONDOWN:
+                pressed_now.add(bkey(ev.joy, ev.button))
+            elif ev.type == pygame.JOYBUTTONUP:
+                pressed_now.discard(bkey(ev.joy, ev.button))
+            elif ev.type == pygame.JOYDEVICEREMOVED:
+                drop_joystick_keys(pressed_now, ev.instance_id)
+                log(f"[setup] Joy{ev.instance_id} disconnected; cleared its pressed buttons.")
+
+            # Absorb any burst that queued behind the first event in one
+            # batched drain; on the typical timeout wakeup the peek is all
+            # this costs.
+            watched = (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYDEVICEREMOVED)
+            if pygame.event.peek(watched):
+                for ev in pygame.event.get(watched):
+                    if ev.type == pygame.JOYBUTTONDOWN:
+                        pressed_now.add(bkey(ev.joy, ev.button))
+                    elif ev.type == pygame.JOYBUTTONUP:
+                        pressed_now.discard(bkey(ev.joy, ev.button))
+                    else:
+                        drop_joystick_keys(pressed_now, ev.instance_id)
+                        log(f"[setup] Joy{ev.instance_id} disconnected; cleared its pressed buttons.")
+
+            if got_event:
+                period = base_period
+            else:
+                period = min(period * 1.5, max_idle_period)
 
-            pressed_now = read_current_pressed_buttons(joysticks)
             new_presses = pressed_now - chosen
             if new_presses:
-                for btn in sorted(new_presses, key=lambda x: (x.joystick_id, x.button_index)):
+                for btn in sorted(new_presses):
                     chosen.add(btn)
-                    print(f"[setup] Added trigger button: {btn}")
+                    log(f"[setup] Added trigger button: {button_name(btn)}")
 
             if chosen != last_printed:
                 last_printed = set(chosen)
                 if chosen:
-                    pretty = ", ".join(str(b) for b in sorted(chosen, key=lambda x: (x.joystick_id, x.button_index)))
-                    print(f"[setup] Current trigger set: {pretty}")
+                    pretty = ", ".join(button_name(b) for b in sorted(chosen))
+                    log(f"[setup] Current trigger set: {pretty}")
                 else:
-                    print("[setup] Current trigger set: (none)")
-
-            time.sleep(1.0 / POLL_HZ)
+                    log("[setup] Current trigger set: (none)")
 
     except KeyboardInterrupt:
-        print("\n[setup] Ctrl+C detected during setup. Exiting cleanly.")
+        log("\n[setup] Ctrl+C detected during setup. Exiting cleanly.")
         raise
 
-    print("[setup] ENTER pressed. Finishing selection.\n")
+    log("[setup] ENTER pressed. Finishing selection.\n")
 
     if not chosen:
-        print("[setup] WARNING: You didn't select any buttons. Monitoring will never trigger.")
+        log("[setup] WARNING: You didn't select any buttons. Monitoring will never trigger.")
     else:
-        pretty = ", ".join(str(b) for b in sorted(chosen, key=lambda x: (x.joystick_id, x.button_index)))
-        print(f"[setup] Final trigger buttons: {pretty}\n")
+        pretty = ", ".join(button_name(b) for b in sorted(chosen))
+        log(f"[setup] Final trigger buttons: {pretty}\n")
 
     return chosen
 
 
-def monitor_triggers_forever(joysticks: Dict[int, pygame.joystick.Joystick], triggers: Set[ButtonInput]) -> None:
-    print(f"[monitor] OR-mode monitoring: hold ANY chosen button for {HOLD_SECONDS:.1f}s to trigger.")
-    print(f"[monitor] Cooldown after trigger: {ACTION_COOLDOWN_SECONDS:.1f}s")
+def monitor_triggers_forever(joysticks: Dict[int, pygame.joystick.Joystick], triggers: Set[int]) -> None:
+    if not triggers:
+        # Without triggers every iteration would be a no-op; don't spin forever.
+        log("[monitor] No trigger buttons configured. Nothing to monitor; exiting.")
+        return
+
+    log(f"[monitor] OR-mode monitoring: hold ANY chosen button for {HOLD_SECONDS:.1f}s to trigger.")
+    log(f"[monitor] Cooldown after trigger: {ACTION_COOLDOWN_SECONDS:.1f}s")
     if ENABLE_MOUSE_OFFSCREEN_WHEN_BOTH_RUNNING:
-        print(f"[monitor] Mouse off-screen check enabled (every {MOUSE_OFFSCREEN_CHECK_EVERY_SECONDS:.1f}s).")
-    print("[monitor] Press Ctrl+C to exit.\n")
+        log(f"[monitor] Mouse off-screen check enabled (every {MOUSE_OFFSCREEN_CHECK_EVERY_SECONDS:.1f}s).")
+    log("[monitor] Press Ctrl+C to exit.\n")
 
-    hold_start_by_btn: Dict[ButtonInput, float] = {}
-    next_allowed_trigger_by_btn: Dict[ButtonInput, float] = {}
-    last_hold_log_bucket_by_btn: Dict[ButtonInput, int] = {}
+    hold_start_by_btn: Dict[int, float] = {}
+    next_allowed_trigger_by_btn: Dict[int, float] = {}
+    last_hold_log_bucket_by_btn: Dict[int, int] = {}
 
     next_mouse_check_time = 0.0  # monotonic timestamp
 
+    # Bind hot globals/attributes to locals: attribute lookups are dict
+    # accesses in CPython and add up in a loop that runs for days.
+    monotonic = time.monotonic
+    event_wait = pygame.event.wait
+    get_events = pygame.event.get
+    peek_events = pygame.event.peek
+    watched = (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYDEVICEREMOVED)
+    hold_seconds = float(HOLD_SECONDS)
+    triggers = frozenset(triggers)
+
+    # Seed from the current hardware state, then keep it updated from events.
+    pressed_now = read_current_pressed_buttons(joysticks)
+
     while True:
-        pump_events_nonblocking()
-        now = time.monotonic()
+        now = monotonic()
 
         # Periodic optional mouse check (non-blocking schedule)
         if ENABLE_MOUSE_OFFSCREEN_WHEN_BOTH_RUNNING and now >= next_mouse_check_time:
-            print("[mouse] Performing periodic check...")
+            log("[mouse] Performing periodic check...")
             maybe_move_mouse_offscreen_if_both_running()
             next_mouse_check_time = now + MOUSE_OFFSCREEN_CHECK_EVERY_SECONDS
 
-        pressed_now = read_current_pressed_buttons(joysticks)
-
         for btn in triggers:
             is_pressed = btn in pressed_now
 
@@ -251,28 +502,63 @@ def monitor_triggers_forever(joysticks: Dict[int, pygame.joystick.Joystick], tri
                 if btn not in hold_start_by_btn:
                     hold_start_by_btn[btn] = now
                     last_hold_log_bucket_by_btn.pop(btn, None)
-                    print(f"[monitor] {btn} pressed. Starting hold timer...")
+                    log(f"[monitor] {button_name(btn)} pressed. Starting hold timer...")
 
                 elapsed = now - hold_start_by_btn[btn]
 
                 bucket = int(elapsed * 4)  # ~4Hz logging
                 if last_hold_log_bucket_by_btn.get(btn) != bucket:
                     last_hold_log_bucket_by_btn[btn] = bucket
-                    print(f"[monitor] Holding {btn}... {elapsed:.2f}/{HOLD_SECONDS:.2f}s")
+                    log(f"[monitor] Holding {button_name(btn)}... {elapsed:.2f}/{hold_seconds:.2f}s")
 
                 next_allowed = next_allowed_trigger_by_btn.get(btn, 0.0)
-                if elapsed >= HOLD_SECONDS and now >= next_allowed:
-                    print(f"[monitor] {btn} held for {elapsed:.2f}s (>= {HOLD_SECONDS:.2f}s). Triggering action!")
+                if elapsed >= hold_seconds and now >= next_allowed:
+                    log(f"[monitor] {button_name(btn)} held for {elapsed:.2f}s (>= {hold_seconds:.2f}s). Triggering action!")
                     on_hold_action(btn)
                     next_allowed_trigger_by_btn[btn] = now + ACTION_COOLDOWN_SECONDS
 
             else:
                 if btn in hold_start_by_btn:
-                    print(f"[monitor] {btn} released/reset.")
+                    log(f"[monitor] {button_name(btn)} released/reset.")
                     hold_start_by_btn.pop(btn, None)
                     last_hold_log_bucket_by_btn.pop(btn, None)
 
-        time.sleep(1.0 / POLL_HZ)
+        # Block until the next joystick event or deadline instead of spinning
+        # at POLL_HZ. While a trigger is held we still wake ~4x/sec so the
+        # hold-progress log and the HOLD_SECONDS deadline fire on time; when
+        # idle we only need to wake for the periodic mouse check.
+        if hold_start_by_btn:
+            timeout_ms = 250
+        else:
+            timeout_ms = 1000
+            if ENABLE_MOUSE_OFFSCREEN_WHEN_BOTH_RUNNING:
+                # Clamp to >= 1: event.wait treats timeout=0 as "no timeout"
+                # and would block forever, and the deadline may already have
+                # passed by the time we recompute it here.
+                until_mouse_check = next_mouse_check_time - monotonic()
+                timeout_ms = max(1, min(timeout_ms, int(until_mouse_check * 1000)))
+
+        ev = event_wait(timeout=timeout_ms)
+        if ev.type == pygame.JOYBUTTONDOWN:
+            pressed_now.add(bkey(ev.joy, ev.button))
+        elif ev.type == pygame.JOYBUTTONUP:
+            pressed_now.discard(bkey(ev.joy, ev.button))
+        elif ev.type == pygame.JOYDEVICEREMOVED:
+            drop_joystick_keys(pressed_now, ev.instance_id)
+            log(f"[monitor] Joy{ev.instance_id} disconnected; cleared its pressed buttons.")
+
+        # Drain whatever else queued up while we slept in one batched call, so
+        # a burst of events is absorbed in a single iteration. Peek first so
+        # the common single-event (or timeout) wakeup skips the drain.
+        if peek_events(watched):
+            for ev in get_events(watched):
+                if ev.type == pygame.JOYBUTTONDOWN:
+                    pressed_now.add(bkey(ev.joy, ev.button))
+                elif ev.type == pygame.JOYBUTTONUP:
+                    pressed_now.discard(bkey(ev.joy, ev.button))
+                else:
+                    drop_joystick_keys(pressed_now, ev.instance_id)
+                    log(f"[monitor] Joy{ev.instance_id} disconnected; cleared its pressed buttons.")
 
 
 def main() -> int:
@@ -281,18 +567,18 @@ def main() -> int:
         print("[main] No controllers available. Exiting.")
         return 1
 
-    triggers = collect_buttons_to_trigger(joysticks)
-
     try:
+        triggers = collect_buttons_to_trigger(joysticks)
         monitor_triggers_forever(joysticks, triggers)
     except KeyboardInterrupt:
-        print("\n[main] Ctrl+C received. Shutting down cleanly...")
+        log("\n[main] Ctrl+C received. Shutting down cleanly...")
     finally:
         try:
             pygame.joystick.quit()
             pygame.quit()
         except Exception:
             pass
+        shutdown_logging()
 
     return 0
 